@@ -3,12 +3,21 @@ Click sequence management for web UI automation.
 Handles sequences of clicks with pixel coordinates and timing.
 """
 import time
-from typing import List, Dict, Any, Union
+from itertools import accumulate
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple, Union
+
+
+_get_xy = itemgetter('x', 'y')
 
 
 class ClickAction:
     """Represents a single click action with coordinates and optional delay."""
     
+    # Recorded sequences can hold thousands of actions; slots keep each
+    # instance free of a per-object __dict__.
+    __slots__ = ('x', 'y', 'delay')
+    
     def __init__(self, x: Union[int, float], y: Union[int, float], delay: float = 1.0):
         self.x = x
         self.y = y
@@ -21,6 +30,8 @@ class ClickAction:
 class ClickSequence:
     """Manages a sequence of click actions that can be executed repeatedly."""
     
+    __slots__ = ('name', 'actions')
+    
     def __init__(self, name: str = "Unnamed Sequence"):
         self.name = name
         self.actions: List[ClickAction] = []
@@ -32,16 +43,39 @@ class ClickSequence:
         return self
     
     def add_clicks(self, clicks: List[Dict[str, Any]]):
-        """Add multiple clicks from a list of dictionaries."""
-        for click in clicks:
-            if 'x' not in click or 'y' not in click:
-                raise ValueError("Each click dictionary must contain 'x' and 'y' keys.")
-            x = click['x']
-            y = click['y']
-            delay = click.get('delay', 1.0)
-            self.add_click(x, y, delay)
+        """Add multiple clicks from a list of dictionaries.
+        
+        All entries are checked before any are added, so a bad entry leaves
+        the sequence unchanged.
+        """
+        try:
+            coordinates = [_get_xy(click) for click in clicks]
+        except (KeyError, TypeError):
+            raise ValueError("Each click dictionary must contain 'x' and 'y' keys.")
+        self.actions.extend([
+            ClickAction(x, y, click.get('delay', 1.0))
+            for (x, y), click in zip(coordinates, clicks)
+        ])
         return self
     
+    def schedule(self, t0: float) -> List[float]:
+        """Return the absolute time at which each action's delay ends.
+
+        Deadlines are cumulative from ``t0`` (e.g. ``time.monotonic()``), so
+        time spent dispatching a click is absorbed by the next wait instead
+        of accumulating as drift over the sequence.
+        """
+        return [t0 + offset for offset in accumulate(max(0.0, action.delay) for action in self.actions)]
+    
+    def columns(self) -> Tuple[List[Union[int, float]], List[Union[int, float]], Optional[float]]:
+        """Return ``(xs, ys, delay)``: the coordinates as two lists, and the
+        delay shared by every action, or None if the delays differ.
+        """
+        actions = self.actions
+        first = actions[0].delay if actions else None
+        delay = first if all(action.delay == first for action in actions) else None
+        return [action.x for action in actions], [action.y for action in actions], delay
+    
     def clear(self):
         """Clear all actions from the sequence."""
         self.actions.clear()
@@ -2,8 +2,47 @@
 """
 Demo script showing the click recording functionality
 """
+import functools
+import json
+import logging
 import time
-from web_automation import WebAutomation
+from pathlib import Path
+from web_automation import WebAutomation, to_data_url
+
+
+# Dispatches a batch of clicks in the page, each on its own setTimeout, so the
+# whole demo costs one WebDriver round-trip instead of one per click. The
+# async script completes once the last click has been dispatched.
+_DISPATCH_CLICKS_JS = """
+    const clicks = JSON.parse(arguments[0]);
+    const done = arguments[arguments.length - 1];
+    clicks.forEach((c, i) => setTimeout(() => {
+        document.dispatchEvent(new MouseEvent('click', {
+            'view': window,
+            'bubbles': true,
+            'cancelable': true,
+            'clientX': c.x,
+            'clientY': c.y
+        }));
+        if (i === clicks.length - 1) done();
+    }, c.t));
+"""
+
+# Demo page with clickable elements, kept next to this script
+_DEMO_HTML_FILE = Path(__file__).with_name('demo_recording.html')
+
+
+@functools.lru_cache(maxsize=None)
+def _demo_html() -> str:
+    """Return the demo page HTML, read from disk on first use."""
+    return _DEMO_HTML_FILE.read_text(encoding='utf-8')
+
+
+@functools.lru_cache(maxsize=None)
+def _demo_data_url() -> str:
+    """Return the demo page as a data URL, saved with the recorded config so
+    replays can load the page."""
+    return to_data_url(_demo_html())
 
 
 def demo_recording():
@@ -12,137 +51,14 @@ def demo_recording():
     print("DEMO: Click Recording Functionality")
     print("=" * 60)
     
-    # Create a test page with clickable elements
-    demo_html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Click Recording Demo</title>
-        <style>
-            body { 
-                font-family: Arial, sans-serif; 
-                padding: 20px; 
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-            }
-            .container {
-                max-width: 600px;
-                margin: 0 auto;
-                background: rgba(255,255,255,0.1);
-                padding: 30px;
-                border-radius: 15px;
-                backdrop-filter: blur(10px);
-            }
-            h1 { text-align: center; margin-bottom: 30px; }
-            .demo-button { 
-                background: linear-gradient(45deg, #ff6b6b, #ee5a52);
-                color: white; 
-                padding: 15px 30px; 
-                border: none; 
-                border-radius: 8px; 
-                margin: 10px; 
-                cursor: pointer; 
-                font-size: 16px;
-                font-weight: bold;
-                transition: all 0.3s ease;
-                display: inline-block;
-                min-width: 120px;
-            }
-            .demo-button:hover { 
-                transform: translateY(-2px);
-                box-shadow: 0 5px 15px rgba(0,0,0,0.3);
-                background: linear-gradient(45deg, #ff5252, #d32f2f);
-            }
-            .demo-button:active { transform: translateY(0px); }
-            .click-area {
-                background: rgba(255,255,255,0.2);
-                border: 2px dashed #fff;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 20px 0;
-                text-align: center;
-                min-height: 100px;
-            }
-            .instruction {
-                background: rgba(255,255,255,0.15);
-                padding: 15px;
-                border-radius: 8px;
-                margin: 15px 0;
-                border-left: 4px solid #4caf50;
-            }
-            .counter {
-                font-size: 24px;
-                font-weight: bold;
-                color: #4caf50;
-                text-align: center;
-                margin: 10px 0;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🖱️ Click Recording Demo</h1>
-            
-            <div class="instruction">
-                <strong>Instructions:</strong> When recording starts, click the buttons below in any order. 
-                Each click will be recorded with precise coordinates and timing.
-            </div>
-            
-            <div style="text-align: center; margin: 20px 0;">
-                <button class="demo-button" onclick="updateCounter('Button 1')">Button 1</button>
-                <button class="demo-button" onclick="updateCounter('Button 2')">Button 2</button>
-                <button class="demo-button" onclick="updateCounter('Button 3')">Button 3</button>
-            </div>
-            
-            <div class="click-area" onclick="updateCounter('Click Area')">
-                <h3>Free Click Area</h3>
-                <p>Click anywhere in this area</p>
-                <div class="counter" id="clickCounter">Clicks: 0</div>
-            </div>
-            
-            <div style="text-align: center; margin: 20px 0;">
-                <button class="demo-button" onclick="updateCounter('Start')">Start Process</button>
-                <button class="demo-button" onclick="updateCounter('Submit')">Submit Form</button>
-                <button class="demo-button" onclick="updateCounter('Finish')">Finish</button>
-            </div>
-            
-            <div class="instruction">
-                <strong>💡 Tip:</strong> Press ESC when you're done recording. The recorded sequence 
-                can then be saved and replayed multiple times automatically!
-            </div>
-        </div>
-        
-        <script>
-            let clickCount = 0;
-            function updateCounter(buttonName) {
-                clickCount++;
-                document.getElementById('clickCounter').textContent = `Clicks: ${clickCount} (Last: ${buttonName})`;
-                
-                // Add visual feedback
-                const elements = document.querySelectorAll('.demo-button, .click-area');
-                elements.forEach(el => {
-                    el.style.transform = 'scale(0.98)';
-                    setTimeout(() => {
-                        el.style.transform = '';
-                    }, 100);
-                });
-            }
-        </script>
-    </body>
-    </html>
-    """
-    
-    # Create data URL
-    import urllib.parse
-    data_url = f"data:text/html;charset=utf-8,{urllib.parse.quote(demo_html)}"
-    
     print("Opening demo page with clickable elements...")
     print("This demo will show the recording capabilities.")
     print()
     
     with WebAutomation(headless=True) as automation:  # Use headless for demo
         # Load the demo page
-        automation.start_browser(data_url)
+        automation.start_browser()
+        automation.set_html(_demo_html())
         automation.set_window_size(900, 700)
         
         print("Demo page loaded! Here's how recording works:")
@@ -158,8 +74,8 @@ def demo_recording():
         # Start recording
         automation.start_recording_mode()
         
-        # Auto-generate some demo clicks for demonstration
-        time.sleep(2)
+        # Auto-generate some demo clicks once the recorder UI is on screen
+        automation.wait_until_ready()
         print("Generating some demo clicks...")
         
         # Simulate clicks at button locations
@@ -172,19 +88,15 @@ def demo_recording():
             (500, 450),  # Finish button
         ]
         
+        # Schedule every click in the browser, one second apart
         for i, (x, y) in enumerate(demo_clicks):
-            time.sleep(1)
             print(f"  Demo click {i+1} at ({x}, {y})")
-            automation.driver.execute_script(f"""
-                var event = new MouseEvent('click', {{
-                    'view': window,
-                    'bubbles': true,
-                    'cancelable': true,
-                    'clientX': {x},
-                    'clientY': {y}
-                }});
-                document.dispatchEvent(event);
-            """)
+        payload = json.dumps([
+            {'x': x, 'y': y, 't': (i + 1) * 1000}
+            for i, (x, y) in enumerate(demo_clicks)
+        ])
+        automation.driver.set_script_timeout(len(demo_clicks) + 5)
+        automation.driver.execute_async_script(_DISPATCH_CLICKS_JS, payload)
         
         print("\nDemo clicks completed! Stopping recording...")
         time.sleep(1)
@@ -203,7 +115,8 @@ def demo_recording():
         automation.save_recorded_clicks_to_config(
             demo_config_file, 
             "Demo Click Sequence", 
-            loops=2
+            loops=2,
+            url=_demo_data_url()
         )
         
         print(f"\n💾 Sequence saved to: {demo_config_file}")
@@ -218,7 +131,7 @@ def demo_recording():
             print("Watch the browser - you'll see the clicks being replayed!")
             time.sleep(2)
             
-            automation.execute_click_sequence(sequence, loops=1)
+            automation.execute_click_sequence(sequence, loops=1, batch=True)
             print("✅ Playback completed!")
         
         print("\n" + "=" * 60)
@@ -235,4 +148,5 @@ def demo_recording():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     demo_recording()
\ No newline at end of file
@@ -5,17 +5,39 @@ Automate clicks in web browser using pixel coordinates with configurable delays
 """
 import json
 import argparse
+import functools
+import logging
+import os
 import sys
-import time
+try:
+    import orjson  # Optional: faster JSON parsing for large configs
+except ImportError:
+    orjson = None
 from web_automation import WebAutomation
 from click_sequence import ClickSequence
 
 
+_NUM = (int, float)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_config_cached(config_file: str, mtime_ns: int):
+    """Parse a configuration file; cached per (path, modification time)."""
+    with open(config_file, 'rb') as f:
+        data = f.read()
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
 def load_config(config_file: str):
-    """Load configuration from JSON file."""
+    """Load configuration from JSON file.
+
+    Parsed configurations are cached until the file is modified, so callers
+    must treat the returned dictionary as read-only.
+    """
     try:
-        with open(config_file, 'r') as f:
-            return json.load(f)
+        mtime_ns = os.stat(config_file).st_mtime_ns
+        return _load_config_cached(config_file, mtime_ns)
     except FileNotFoundError:
         print(f"Error: Configuration file '{config_file}' not found.")
         sys.exit(1)
@@ -24,40 +46,71 @@ def load_config(config_file: str):
         sys.exit(1)
 
 
-def run_automation_from_config(config_file: str, headless: bool = False):
-    """Run automation from a configuration file."""
+def _is_valid_click(click) -> bool:
+    """Return whether a click entry has numeric 'x', 'y' and optional 'delay'."""
+    return (isinstance(click, dict)
+            and isinstance(click.get('x'), _NUM)
+            and isinstance(click.get('y'), _NUM)
+            and ('delay' not in click or isinstance(click['delay'], _NUM)))
+
+
+def _describe_invalid_click(idx: int, click) -> str:
+    """Explain why a click entry rejected by _is_valid_click() is invalid."""
+    if not isinstance(click, dict):
+        return f"Click #{idx+1} is not a valid object: {click}"
+    if 'x' not in click or 'y' not in click:
+        return f"Click #{idx+1} missing 'x' or 'y' field: {click}"
+    if not isinstance(click['x'], _NUM):
+        return f"Click #{idx+1} 'x' coordinate is not a number: {click['x']}"
+    if not isinstance(click['y'], _NUM):
+        return f"Click #{idx+1} 'y' coordinate is not a number: {click['y']}"
+    return f"Click #{idx+1} 'delay' is not a number: {click['delay']}"
+
+
+def validate_config(config):
+    """Validate the structure of a loaded configuration.
+
+    The configuration must be an object with a non-empty 'clicks' list whose
+    entries are objects with numeric 'x' and 'y' and an optional numeric
+    'delay'. An optional 'batch' must be a boolean. Raises ValueError describing the first problem found.
+    """
+    if not isinstance(config, dict):
+        raise ValueError("Configuration must be a JSON object.")
+    clicks = config.get('clicks', [])
+    if not isinstance(clicks, list):
+        raise ValueError(f"'clicks' must be a list: {clicks}")
+    if not clicks:
+        raise ValueError("No clicks defined in configuration.")
+    
+    # Error messages are only built for the first bad entry
+    bad = next((idx for idx, click in enumerate(clicks) if not _is_valid_click(click)), None)
+    if bad is not None:
+        raise ValueError(_describe_invalid_click(bad, clicks[bad]))
+    if not isinstance(config.get('batch', False), bool):
+        raise ValueError(f"'batch' must be true or false: {config['batch']}")
+
+
+def run_automation_from_config(config_file: str, headless: bool = False, batch: bool = False):
+    """Run automation from a configuration file.
+    
+    Clicks are sent to the page in one batch when ``batch`` is True or the
+    configuration sets ``"batch": true``.
+    """
     config = load_config(config_file)
+    try:
+        validate_config(config)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     
     # Extract configuration
     sequence_name = config.get('name', 'Automated Sequence')
     loops = config.get('loops', 1)
     url = config.get('url', 'about:blank')
-    clicks = config.get('clicks', [])
+    clicks = config['clicks']
     window_size = config.get('window_size', {})
+    batch = batch or config.get('batch', False)
     
-    # Validate clicks
-    if not clicks:
-        print("Error: No clicks defined in configuration.")
-        sys.exit(1)
-
-    # Validate each click entry
-    for idx, click in enumerate(clicks):
-        if not isinstance(click, dict):
-            print(f"Error: Click #{idx+1} is not a valid object: {click}")
-            sys.exit(1)
-        if 'x' not in click or 'y' not in click:
-            print(f"Error: Click #{idx+1} missing 'x' or 'y' field: {click}")
-            sys.exit(1)
-        if not (isinstance(click['x'], int) or isinstance(click['x'], float)):
-            print(f"Error: Click #{idx+1} 'x' coordinate is not a number: {click['x']}")
-            sys.exit(1)
-        if not (isinstance(click['y'], int) or isinstance(click['y'], float)):
-            print(f"Error: Click #{idx+1} 'y' coordinate is not a number: {click['y']}")
-            sys.exit(1)
-        if 'delay' in click and not (isinstance(click['delay'], int) or isinstance(click['delay'], float)):
-            print(f"Error: Click #{idx+1} 'delay' is not a number: {click['delay']}")
-            sys.exit(1)
-
     # Run automation
     with WebAutomation(headless=headless) as automation:
         # Create click sequence
@@ -70,10 +123,10 @@ def run_automation_from_config(config_file: str, headless: bool = False):
             automation.set_window_size(window_size['width'], window_size['height'])
         
         # Execute the sequence
-        automation.execute_click_sequence(sequence, loops)
+        automation.execute_click_sequence(sequence, loops, batch=batch)
 
 
-def run_recording_mode():
+def run_recording_mode(batch: bool = False):
     """Run automation in recording mode to capture clicks."""
     print("Web UI Automation - Recording Mode")
     print("==================================")
@@ -109,24 +162,11 @@ def run_recording_mode():
         print("\nRecording started! Click on the webpage and press ESC when done.")
         print("Waiting for recording to complete...")
         
-        # Poll for recording completion
-        while automation.recording_mode:
-            time.sleep(0.5)
-            try:
-                # Check if recording has stopped
-                is_recording = automation.driver.execute_script("""
-                    return window.clickRecorder ? window.clickRecorder.recording : false;
-                """)
-                if not is_recording:
-                    break
-            except JavascriptException as e:
-                # Handle case where window.clickRecorder is not initialized
-                print("Warning: window.clickRecorder is not initialized yet. Waiting for initialization...")
-                continue
-            except Exception as e:
-                # Browser might be closed or other error occurred
-                print(f"Error during recording check: {e}")
-                break
+        try:
+            automation.wait_for_recording_stop()
+        except Exception as e:
+            # Browser might be closed or other error occurred
+            print(f"Error during recording check: {e}")
         
         # Stop recording and get clicks
         recorded_clicks = automation.stop_recording_mode()
@@ -175,11 +215,11 @@ def run_recording_mode():
             if run_now:
                 print(f"Running recorded sequence '{name}' {loops} time(s)...")
                 sequence = automation.create_sequence_from_recorded_clicks(name)
-                automation.execute_click_sequence(sequence, loops)
+                automation.execute_click_sequence(sequence, loops, batch=batch)
                 print("Playback completed!")
 
 
-def run_interactive_mode():
+def run_interactive_mode(batch: bool = False):
     """Run automation in interactive mode."""
     print("Web UI Automation - Interactive Mode")
     print("=====================================")
@@ -207,23 +247,27 @@ def run_interactive_mode():
     # Create sequence
     sequence = ClickSequence("Interactive Sequence")
     
-    print("\nEnter click coordinates (press Enter with empty x to finish):")
+    print("\nEnter clicks as x,y[,delay] (default delay: 1.0), one per line.")
+    print("Press Enter on an empty line to finish:")
+    clicks = []
     while True:
-        x_input = input("X coordinate: ").strip()
-        if not x_input:
+        line = input("Click: ").strip()
+        if not line:
             break
         
-        y_input = input("Y coordinate: ").strip()
-        delay_input = input("Delay after click (default: 1.0): ").strip()
-        
+        fields = line.split(',')
         try:
-            x = int(x_input)
-            y = int(y_input)
-            delay = float(delay_input) if delay_input else 1.0
-            sequence.add_click(x, y, delay)
-            print(f"Added click at ({x}, {y}) with {delay}s delay")
+            if len(fields) not in (2, 3):
+                raise ValueError(line)
+            x = int(fields[0])
+            y = int(fields[1])
+            delay = float(fields[2]) if len(fields) == 3 and fields[2].strip() else 1.0
         except ValueError:
-            print("Invalid input. Please enter numeric values.")
+            print("Invalid input. Please enter x,y or x,y,delay with numeric values.")
+            continue
+        clicks.append({'x': x, 'y': y, 'delay': delay})
+        print(f"Added click at ({x}, {y}) with {delay}s delay")
+    sequence.add_clicks(clicks)
     
     if len(sequence) == 0:
         print("No clicks added. Exiting.")
@@ -233,12 +277,46 @@ def run_interactive_mode():
     print(f"\nStarting automation...")
     with WebAutomation(headless=headless) as automation:
         automation.start_browser(url)
-        automation.execute_click_sequence(sequence, loops)
+        automation.execute_click_sequence(sequence, loops, batch=batch)
 
 
-def main():
+_EXAMPLE_USAGE = """
+Example usage:
+  python main.py -c example_config.json
+  python main.py --interactive
+  python main.py --record
+  python main.py -c example_config.json --headless
+  python main.py -c example_config.json --batch"""
+
+_HELP_WIDTH = 80  # Columns of --help output, whatever the terminal width
+
+# Help shown when main.py is run without arguments, so the common no-args
+# launch skips building the parser. It lists the same options as
+# build_parser() but is intentionally approximate: argparse's exact layout
+# varies between Python versions (3.13 prints "-c, --config CONFIG").
+_NO_ARGS_HELP = """usage: main.py [-h] [-c CONFIG] [--headless] [--batch] [-i] [-r]
+
+Web UI Automation - Automate clicks using pixel coordinates
+
+options:
+  -h, --help            show this help message and exit
+  -c CONFIG, --config CONFIG
+                        Configuration file (JSON format)
+  --headless            Run browser in headless mode
+  --batch               Send clicks in one batch (clicks must not navigate)
+  -i, --interactive     Run in interactive mode
+  -r, --record          Run in recording mode to capture clicks
+""" + _EXAMPLE_USAGE
+
+
+@functools.lru_cache(maxsize=None)
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser (once per process)."""
     parser = argparse.ArgumentParser(
-        description="Web UI Automation - Automate clicks using pixel coordinates"
+        prog='main.py',
+        description="Web UI Automation - Automate clicks using pixel coordinates",
+        # Fixed width, so the help doesn't rewrap with the terminal size
+        formatter_class=functools.partial(argparse.HelpFormatter, width=_HELP_WIDTH)
     )
     parser.add_argument(
         '-c', '--config',
@@ -249,6 +327,11 @@ def main():
         action='store_true',
         help='Run browser in headless mode'
     )
+    parser.add_argument(
+        '--batch',
+        action='store_true',
+        help='Send clicks in one batch (clicks must not navigate)'
+    )
     parser.add_argument(
         '-i', '--interactive',
         action='store_true',
@@ -259,23 +342,30 @@ def main():
         action='store_true',
         help='Run in recording mode to capture clicks'
     )
+    return parser
+
+
+def main():
+    # Sequence progress is reported through logging; show it like other output
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     
+    if len(sys.argv) == 1:
+        # Show help if no arguments provided
+        print(_NO_ARGS_HELP)
+        return
+    
+    parser = build_parser()
     args = parser.parse_args()
     
     if args.record:
-        run_recording_mode()
+        run_recording_mode(args.batch)
     elif args.interactive:
-        run_interactive_mode()
+        run_interactive_mode(args.batch)
     elif args.config:
-        run_automation_from_config(args.config, args.headless)
+        run_automation_from_config(args.config, args.headless, args.batch)
     else:
-        # Show help if no arguments provided
         parser.print_help()
-        print("\nExample usage:")
-        print("  python main.py -c example_config.json")
-        print("  python main.py --interactive")
-        print("  python main.py --record")
-        print("  python main.py -c example_config.json --headless")
+        print(_EXAMPLE_USAGE)
 
 
 if __name__ == "__main__":
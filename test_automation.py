@@ -4,7 +4,35 @@ Test script for Web UI Automation
 """
 import sys
 from web_automation import WebAutomation
-from click_sequence import ClickSequence
+from click_sequence import ClickAction, ClickSequence
+
+
+def test_sequence_columns():
+    """Check columns() and schedule() against the current actions."""
+    sequence = ClickSequence("Columns")
+    sequence.add_click(1, 2, 0.5)
+    sequence.add_click(3, 4, 0.5)
+    assert sequence.columns() == ([1, 3], [2, 4], 0.5)
+    assert sequence.schedule(0.0) == [0.5, 1.0]
+    
+    # Changes made directly to the public actions list are seen too
+    sequence.actions.append(ClickAction(5, 6, 3.0))
+    assert sequence.columns() == ([1, 3, 5], [2, 4, 6], None)
+    assert sequence.schedule(10.0) == [10.5, 11.0, 14.0]
+    
+    sequence.clear()
+    assert sequence.columns() == ([], [], None)
+    assert sequence.schedule(0.0) == []
+    
+    # Entries that aren't click dictionaries are rejected as a whole
+    for bad in ([{'x': 1, 'y': 2}, {'x': 3}], [{'x': 1, 'y': 2}, [3, 4]], ["1,2"]):
+        try:
+            sequence.add_clicks(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"add_clicks accepted {bad}")
+    assert len(sequence) == 0
 
 
 def test_basic_automation():
@@ -21,29 +49,30 @@ def test_basic_automation():
     print(f"Number of actions: {len(sequence)}")
     
     try:
-        # Test with headless browser
-        with WebAutomation(headless=True) as automation:
-            print("Starting browser...")
-            automation.start_browser("data:text/html,<html><body><h1>Test Page</h1></body></html>")
-            
-            print("Setting window size...")
-            automation.set_window_size(800, 600)
-            
-            print("Getting window size...")
-            size = automation.get_window_size()
-            print(f"Window size: {size}")
-            
-            print("Executing click sequence...")
-            automation.execute_click_sequence(sequence, loops=2)
-            
-            print("Test completed successfully!")
-            return True
-            
+        # Test with the shared headless browser
+        automation = WebAutomation.get_shared(headless=True)
+        print("Loading test page...")
+        automation.set_html("<html><body><h1>Test Page</h1></body></html>")
+        
+        print("Setting window size...")
+        automation.set_window_size(800, 600)
+        
+        print("Getting window size...")
+        size = automation.get_window_size()
+        print(f"Window size: {size}")
+        
+        print("Executing click sequence...")
+        automation.execute_click_sequence(sequence, loops=2, batch=True)
+        
+        print("Test completed successfully!")
+        return True
+        
     except Exception as e:
         print(f"Error during automation test: {e}")
         return False
 
 
 if __name__ == "__main__":
+    test_sequence_columns()
     success = test_basic_automation()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -2,10 +2,10 @@
 """
 Test script for click recording functionality
 """
-import time
 import json
 import os
-from web_automation import WebAutomation
+from pathlib import Path
+from web_automation import WebAutomation, to_data_url
 from click_sequence import ClickSequence
 
 
@@ -15,146 +15,119 @@ def test_recording_functionality():
     
     try:
         # Test with a simple HTML page that has clickable elements
-        test_html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Test Page for Click Recording</title>
-            <style>
-                body { font-family: Arial, sans-serif; padding: 20px; }
-                .button { 
-                    background: #007cba; 
-                    color: white; 
-                    padding: 10px 20px; 
-                    border: none; 
-                    border-radius: 5px; 
-                    margin: 10px; 
-                    cursor: pointer; 
-                    display: inline-block;
-                }
-                .button:hover { background: #005a8b; }
-                .test-area {
-                    width: 300px;
-                    height: 200px;
-                    border: 2px solid #ccc;
-                    margin: 20px 0;
-                    padding: 20px;
-                    background: #f9f9f9;
-                }
-            </style>
-        </head>
-        <body>
-            <h1>Click Recording Test Page</h1>
-            <p>This page is used to test click recording functionality.</p>
-            
-            <div class="button" onclick="alert('Button 1 clicked!')">Button 1</div>
-            <div class="button" onclick="alert('Button 2 clicked!')">Button 2</div>
-            <div class="button" onclick="alert('Button 3 clicked!')">Button 3</div>
-            
-            <div class="test-area">
-                <h3>Test Area</h3>
-                <p>Click anywhere in this area to test coordinate recording.</p>
-                <p>Current coordinates will be captured precisely.</p>
-            </div>
-            
-            <div class="button" onclick="alert('Bottom button clicked!')">Bottom Button</div>
-        </body>
-        </html>
-        """
+        test_html = Path(__file__).with_name('test_recording.html').read_text(encoding='utf-8')
         
-        data_url = f"data:text/html;charset=utf-8,{test_html}"
+        data_url = to_data_url(test_html)  # Stored in the saved config
         
-        # Test recording mode
-        with WebAutomation(headless=True) as automation:  # Use headless to avoid conflicts
-            print("Starting browser with test page...")
-            automation.start_browser(data_url)
-            automation.set_window_size(800, 600)
-            
-            print("Starting recording mode...")
-            automation.start_recording_mode()
+        # Test recording mode in the shared headless browser
+        automation = WebAutomation.get_shared(headless=True)
+        print("Loading test page...")
+        automation.set_html(test_html)
+        automation.set_window_size(800, 600)
+        
+        print("Starting recording mode...")
+        automation.start_recording_mode()
+        
+        # Simulate some clicks programmatically for testing
+        print("Simulating clicks for testing...")
+        
+        # Simulate clicks at known coordinates, one per animation frame; the
+        # async script returns once recording has been stopped
+        automation.driver.execute_async_script("""
+            const done = arguments[arguments.length - 1];
+            const clicks = [[100, 150], [200, 250], [150, 200]];
             
-            # Simulate some clicks programmatically for testing
-            print("Simulating clicks for testing...")
-            time.sleep(1)
+            // Simulate clicks for testing
+            function simulateClick(x, y) {
+                const event = new MouseEvent('click', {
+                    'view': window,
+                    'bubbles': true,
+                    'cancelable': true,
+                    'clientX': x,
+                    'clientY': y
+                });
+                document.dispatchEvent(event);
+            }
             
-            # Simulate clicks at known coordinates
-            automation.driver.execute_script("""
-                // Simulate clicks for testing
-                function simulateClick(x, y) {
-                    const event = new MouseEvent('click', {
-                        'view': window,
-                        'bubbles': true,
-                        'cancelable': true,
-                        'clientX': x,
-                        'clientY': y
-                    });
-                    document.dispatchEvent(event);
+            let next = 0;
+            function step() {
+                if (next < clicks.length) {
+                    simulateClick(...clicks[next++]);
+                    requestAnimationFrame(step);
+                    return;
                 }
                 
-                // Simulate a sequence of clicks with delays
-                setTimeout(() => simulateClick(100, 150), 500);
-                setTimeout(() => simulateClick(200, 250), 1000);
-                setTimeout(() => simulateClick(150, 200), 1500);
-                
                 // Stop recording after simulated clicks
-                setTimeout(() => {
-                    window.clickRecorder.recording = false;
-                    const indicator = document.getElementById('recordingIndicator');
-                    if (indicator) {
-                        indicator.innerHTML = '⏹️ RECORDING STOPPED (TEST MODE)';
-                        indicator.style.backgroundColor = 'rgba(0, 150, 0, 0.8)';
-                    }
-                }, 2000);
-            """)
+                window.clickRecorder.recording = false;
+                const indicator = document.getElementById('recordingIndicator');
+                if (indicator) {
+                    indicator.innerHTML = '⏹️ RECORDING STOPPED (TEST MODE)';
+                    indicator.style.backgroundColor = 'rgba(0, 150, 0, 0.8)';
+                }
+                done();
+            }
+            requestAnimationFrame(step);
+        """)
+        
+        # Wait for the stop as the CLI does, then poll as a long recording
+        # would; the clicks delivered with the stop must not be polled again
+        if not automation.wait_for_recording_stop(timeout=5):
+            print("✗ Recording stop was not reported")
+            return False
+        polled_clicks = automation.poll_recorded_clicks()
+        if polled_clicks:
+            print(f"✗ Expected no clicks left to poll, got {len(polled_clicks)}")
+            return False
+        print("✓ No clicks polled twice after the stop notification")
+        
+        # Stop recording and get results
+        recorded_clicks = automation.stop_recording_mode()
+        if len(recorded_clicks) != 3:
+            print(f"✗ Expected 3 recorded clicks, got {len(recorded_clicks)}")
+            return False
+        
+        if recorded_clicks:
+            print(f"✓ Recording successful! Captured {len(recorded_clicks)} clicks:")
+            for i, click in enumerate(recorded_clicks, 1):
+                print(f"  {i}. Click at ({click['x']}, {click['y']}) with {click['delay']:.1f}s delay")
             
-            # Wait for simulated clicks to complete
-            time.sleep(3)
+            # Test creating sequence from recorded clicks
+            sequence = automation.create_sequence_from_recorded_clicks("Test Recorded Sequence")
+            print(f"✓ Created sequence: {sequence}")
             
-            # Stop recording and get results
-            recorded_clicks = automation.stop_recording_mode()
+            # Test saving to config file
+            test_config_file = "/tmp/test_recorded_config.json"
+            automation.save_recorded_clicks_to_config(
+                test_config_file, 
+                "Test Recording", 
+                loops=2,
+                url=data_url
+            )
             
-            if recorded_clicks:
-                print(f"✓ Recording successful! Captured {len(recorded_clicks)} clicks:")
-                for i, click in enumerate(recorded_clicks, 1):
-                    print(f"  {i}. Click at ({click['x']}, {click['y']}) with {click['delay']:.1f}s delay")
-                
-                # Test creating sequence from recorded clicks
-                sequence = automation.create_sequence_from_recorded_clicks("Test Recorded Sequence")
-                print(f"✓ Created sequence: {sequence}")
+            # Verify the saved file
+            if os.path.exists(test_config_file):
+                with open(test_config_file, 'r') as f:
+                    saved_config = json.load(f)
+                print(f"✓ Config file saved successfully with {len(saved_config['clicks'])} clicks")
+                print(f"  Config name: {saved_config['name']}")
+                print(f"  Loops: {saved_config['loops']}")
                 
-                # Test saving to config file
-                test_config_file = "/tmp/test_recorded_config.json"
-                automation.save_recorded_clicks_to_config(
-                    test_config_file, 
-                    "Test Recording", 
-                    loops=2,
-                    url=data_url
-                )
-                
-                # Verify the saved file
-                if os.path.exists(test_config_file):
-                    with open(test_config_file, 'r') as f:
-                        saved_config = json.load(f)
-                    print(f"✓ Config file saved successfully with {len(saved_config['clicks'])} clicks")
-                    print(f"  Config name: {saved_config['name']}")
-                    print(f"  Loops: {saved_config['loops']}")
-                    
-                    # Clean up test file
-                    os.remove(test_config_file)
-                else:
-                    print("✗ Failed to save config file")
-                    return False
-                
-                # Test playback of recorded sequence (brief test)
-                print("Testing playback of recorded sequence...")
-                automation.execute_click_sequence(sequence, loops=1)
-                print("✓ Playback test completed")
-                
-                return True
+                # Clean up test file
+                os.remove(test_config_file)
             else:
-                print("✗ No clicks were recorded")
+                print("✗ Failed to save config file")
                 return False
-                
+            
+            # Test playback of recorded sequence (brief test)
+            print("Testing playback of recorded sequence...")
+            automation.execute_click_sequence(sequence, loops=1, batch=True)
+            print("✓ Playback test completed")
+            
+            return True
+        else:
+            print("✗ No clicks were recorded")
+            return False
+            
     except Exception as e:
         print(f"✗ Error during recording test: {e}")
         import traceback
@@ -166,22 +139,29 @@ def test_help_and_arguments():
     """Test that the new recording argument is available."""
     print("\nTesting command-line arguments...")
     
-    import subprocess
-    import sys
-    
     try:
+        from main import build_parser, _NO_ARGS_HELP
+        
         # Test help output includes recording option
-        result = subprocess.run([sys.executable, "main.py", "--help"], 
-                              capture_output=True, text=True, timeout=10)
+        help_text = build_parser().format_help()
         
-        if "--record" in result.stdout and "recording mode" in result.stdout:
-            print("✓ Recording argument available in help")
-            return True
-        else:
+        if "--record" not in help_text or "recording mode" not in help_text:
             print("✗ Recording argument not found in help output")
-            print("Help output:", result.stdout)
+            print("Help output:", help_text)
             return False
-            
+        print("✓ Recording argument available in help")
+        
+        # The static no-arguments help must list every option and help line
+        # of the real parser; its exact layout varies between Python versions
+        for action in build_parser()._actions:
+            missing = [text for text in (*action.option_strings, action.help)
+                       if text not in _NO_ARGS_HELP]
+            if missing:
+                print(f"✗ Static no-arguments help is out of date: missing {missing}")
+                return False
+        print("✓ Static no-arguments help matches parser")
+        return True
+        
     except Exception as e:
         print(f"✗ Error testing command-line arguments: {e}")
         return False
@@ -2,101 +2,786 @@
 Web UI Automation - Main automation class for browser control and click automation.
 Provides functionality to automate clicks using pixel coordinates with configurable delays.
 """
+import asyncio
+import atexit
+import base64
+import contextlib
+import copy
+import functools
+import hashlib
+import logging
+import os
+import queue
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
 import time
 import json
-from typing import Optional, List, Dict, Union
+from pathlib import Path
+from typing import Optional, List, Dict, Tuple, Union
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from click_sequence import ClickSequence, ClickAction
+try:
+    import orjson  # Optional: faster serialization of large script payloads
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+# Page helper installed once per document (Page.addScriptToEvaluateOnNewDocument
+# in start_browser, or injected on demand), so the recorder and the sequence
+# runner are compiled once per page load. The scripts the Python side sends
+# are short calls into window.__wa that report _HELPER_MISSING if the page
+# doesn't have it yet.
+_HELPER_JS = """
+(function() {
+    if (window.__wa) return;
+    window.__wa = {
+        // In-page click recorder, started by start_recording_mode()
+        startRecording: function() {
+            // Store reference to automation object for access from click handler
+            // Setting recording = false (ESC, stop_recording_mode or a test) notifies
+            // any waiter registered by wait_for_recording_stop()
+            window.clickRecorder = {
+                recordedClicks: [],
+                drainedCount: 0,  // clicks already handed over by poll_recorded_clicks()
+                lastClickTime: null,  // performance.now() of the previous click
+                _recording: true,
+                onStop: null,
+                get recording() {
+                    return this._recording;
+                },
+                set recording(value) {
+                    this._recording = value;
+                    if (!value && this.onStop) {
+                        const onStop = this.onStop;
+                        this.onStop = null;
+                        onStop();
+                    }
+                }
+            };
+            
+            // Pool of click markers, styled once and reused round-robin, so a click
+            // only moves and shows a marker instead of creating and removing one
+            const MARKER_POOL_SIZE = 16;
+            const markerPool = Array.from({length: MARKER_POOL_SIZE}, () => {
+                const marker = document.createElement('div');
+                marker.style.position = 'fixed';
+                marker.style.left = '0px';
+                marker.style.top = '0px';
+                marker.style.width = '10px';
+                marker.style.height = '10px';
+                marker.style.backgroundColor = 'red';
+                marker.style.borderRadius = '50%';
+                marker.style.pointerEvents = 'none';
+                marker.style.zIndex = '9999';
+                marker.style.visibility = 'hidden';
+                document.body.appendChild(marker);
+                return marker;
+            });
+            let nextMarker = 0;
+            
+            // Show a pooled marker at (x, y), hidden again after 1 second
+            function drawMarker(x, y) {
+                const marker = markerPool[nextMarker];
+                nextMarker = (nextMarker + 1) % MARKER_POOL_SIZE;
+                marker.style.transform = `translate(${x}px, ${y}px) translate(-50%, -50%)`;
+                marker.style.visibility = 'visible';
+                clearTimeout(marker.hideTimer);
+                marker.hideTimer = setTimeout(() => {
+                    marker.style.visibility = 'hidden';
+                }, 1000);
+            }
+            
+            // Markers are drawn once per animation frame, batching all clicks since
+            // the last frame, so the click handler itself does no DOM work
+            const pendingMarkers = [];
+            let drawScheduled = false;
+            function scheduleDraw() {
+                if (drawScheduled) return;
+                drawScheduled = true;
+                requestAnimationFrame(() => {
+                    drawScheduled = false;
+                    for (const [x, y] of pendingMarkers.splice(0)) {
+                        drawMarker(x, y);
+                    }
+                });
+            }
+            
+            // Function to handle click events
+            function recordClick(event) {
+                if (window.clickRecorder.recording) {
+                    // Delay is the time since the previous click, clamped between
+                    // 0.1s and 10s (1.0s for the first click), so Python receives
+                    // clicks in their final {x, y, delay} shape
+                    const recorder = window.clickRecorder;
+                    const now = performance.now();
+                    const delay = recorder.lastClickTime === null ? 1.0
+                        : Math.min(10, Math.max(0.1, (now - recorder.lastClickTime) / 1000));
+                    recorder.lastClickTime = now;
+                    recorder.recordedClicks.push({
+                        x: event.clientX,
+                        y: event.clientY,
+                        delay: delay
+                    });
+                    
+                    // Visual feedback for recorded click, drawn on the next frame
+                    pendingMarkers.push([event.clientX, event.clientY]);
+                    scheduleDraw();
+                    
+                    console.log('Recorded click at:', event.clientX, event.clientY);
+                }
+            }
+            
+            // Add click event listener
+            document.addEventListener('click', recordClick, true);
+            
+            // Show recording indicator
+            const indicator = document.createElement('div');
+            indicator.id = 'recordingIndicator';
+            indicator.innerHTML = '🔴 RECORDING CLICKS - Press ESC to stop';
+            indicator.style.position = 'fixed';
+            indicator.style.top = '10px';
+            indicator.style.left = '50%';
+            indicator.style.transform = 'translateX(-50%)';
+            indicator.style.backgroundColor = 'rgba(255, 0, 0, 0.8)';
+            indicator.style.color = 'white';
+            indicator.style.padding = '10px 20px';
+            indicator.style.borderRadius = '5px';
+            indicator.style.fontFamily = 'Arial, sans-serif';
+            indicator.style.fontSize = '14px';
+            indicator.style.zIndex = '10000';
+            indicator.style.fontWeight = 'bold';
+            document.body.appendChild(indicator);
+            
+            // Add ESC key listener to stop recording
+            function stopRecordingOnEsc(event) {
+                if (event.key === 'Escape') {
+                    window.clickRecorder.recording = false;
+                    const indicator = document.getElementById('recordingIndicator');
+                    if (indicator) {
+                        indicator.innerHTML = '⏹️ RECORDING STOPPED - Close this tab to continue';
+                        indicator.style.backgroundColor = 'rgba(0, 150, 0, 0.8)';
+                    }
+                    document.removeEventListener('keydown', stopRecordingOnEsc);
+                    document.removeEventListener('click', recordClick, true);
+                }
+            }
+            document.addEventListener('keydown', stopRecordingOnEsc);
+        },
+        
+        // Stops the recorder and drains the clicks not yet handed over
+        stopRecording: function() {
+            const recorder = window.clickRecorder;
+            if (!recorder) return [];
+            recorder.recording = false;
+            return window.__wa.drainRecording();
+        },
+        
+        // Hands over and clears the clicks recorded since the previous
+        // drain, so long recordings are fetched in small pieces instead of
+        // one large payload
+        drainRecording: function() {
+            const recorder = window.clickRecorder;
+            if (!recorder) return [];
+            const clicks = recorder.recordedClicks;
+            recorder.recordedClicks = [];
+            recorder.drainedCount += clicks.length;
+            return clicks;
+        },
+        
+        // Calls done(clicks) with the clicks not yet drained once the
+        // recorder stops (or if none is running); they are drained, so no
+        // later poll or stop hands them over again
+        waitForStop: function(done) {
+            const recorder = window.clickRecorder;
+            if (!recorder) {
+                done([]);
+            } else if (!recorder.recording) {
+                done(window.__wa.drainRecording());
+            } else {
+                recorder.onStop = () => done(window.__wa.drainRecording());
+            }
+        },
+        
+        // Plays a click sequence. payload is a JSON list of [x, y, offset_ms]
+        // where offset_ms is the cumulative delay after that click, or
+        // {xs, ys, delay} when every click is followed by the same delay_ms;
+        // it is played loops times. Waits are measured from the start, so dispatch time
+        // doesn't drift across clicks or passes. With cacheTargets the
+        // element hit at each point is remembered (per payload) and reused
+        // while it stays in the document, instead of hit-testing again.
+        // Resolves to null, or to the error message if playback failed.
+        runSequence: function(payload, loops, cacheTargets) {
+            const data = JSON.parse(payload);
+            const uniform = !Array.isArray(data);
+            const count = uniform ? data.xs.length : data.length;
+            const period = uniform ? count * data.delay : data[count - 1][2];
+            let targets = null;
+            if (cacheTargets) {
+                const cache = window.__clickTargetCache;
+                if (cache && cache.payload === payload) {
+                    targets = cache.targets;
+                } else {
+                    targets = new Array(count).fill(null);
+                    window.__clickTargetCache = {payload: payload, targets: targets};
+                }
+            }
+            const start = performance.now();
+            return (async () => {
+                for (let loop = 0; loop < loops; loop++) {
+                    const base = start + loop * period;
+                    for (let i = 0; i < count; i++) {
+                        const x = uniform ? data.xs[i] : data[i][0];
+                        const y = uniform ? data.ys[i] : data[i][1];
+                        const offset = uniform ? (i + 1) * data.delay : data[i][2];
+                        let element = targets && targets[i];
+                        if (!element || !element.isConnected) {
+                            element = document.elementFromPoint(x, y);
+                            if (targets) {
+                                targets[i] = element;
+                            }
+                        }
+                        if (element) {
+                            element.dispatchEvent(new MouseEvent('click', {
+                                'view': window,
+                                'bubbles': true,
+                                'cancelable': true,
+                                'clientX': x,
+                                'clientY': y
+                            }));
+                        }
+                        const wait = base + offset - performance.now();
+                        if (wait > 0) {
+                            await new Promise(resolve => setTimeout(resolve, wait));
+                        }
+                    }
+                }
+            })().then(() => null, error => String(error));
+        }
+    };
+})();
+"""
+
+# Returned by the call scripts below when window.__wa is not installed.
+_HELPER_MISSING = '__wa:missing'
+
+# Starts the in-page recorder.
+_RECORDER_JS = """
+    if (!window.__wa) return '__wa:missing';
+    window.__wa.startRecording();
+    return null;
+"""
+
+# Stops the in-page recorder and returns the clicks not yet polled.
+_STOP_RECORDING_JS = """
+    if (!window.__wa) return '__wa:missing';
+    return window.__wa.stopRecording();
+"""
+
+# Hands over the clicks recorded since the previous drain.
+_DRAIN_RECORDING_JS = """
+    if (!window.__wa) return '__wa:missing';
+    return window.__wa.drainRecording();
+"""
+
+# Async script that completes once the recorder stops (or is not running),
+# delivering the recorded clicks with the notification.
+_WAIT_FOR_STOP_JS = """
+    const done = arguments[arguments.length - 1];
+    if (!window.__wa) {
+        done('__wa:missing');
+        return;
+    }
+    window.__wa.waitForStop(done);
+"""
+
+# Evaluated through CDP Runtime.evaluate by get_recording_state().
+_RECORDING_STATE_EXPR = """(function() {
+    var recorder = window.clickRecorder;
+    if (!recorder) return {recording: false, clickCount: 0};
+    return {recording: recorder.recording,
+            clickCount: recorder.drainedCount + recorder.recordedClicks.length};
+})()"""
+
+# Completes after two animation frames, i.e. once the current state of the
+# page has been painted.
+_NEXT_FRAME_JS = """
+    const done = arguments[arguments.length - 1];
+    requestAnimationFrame(() => requestAnimationFrame(() => done()));
+"""
+
+# Plays a click sequence inside the page with window.__wa.runSequence; the
+# arguments are the payload, the number of passes and the cacheTargets flag.
+_RUN_SEQUENCE_JS = """
+    const done = arguments[arguments.length - 1];
+    if (!window.__wa) {
+        done('__wa:missing');
+        return;
+    }
+    window.__wa.runSequence(arguments[0], arguments[1], arguments[2]).then(done);
+"""
+
+# Resolved ChromeDriver paths, keyed by Chrome major version, so later
+# processes can skip ChromeDriverManager's download/metadata lookups.
+_DRIVER_CACHE_FILE = Path.home() / '.cache' / 'web_ui_automation' / 'driver.json'
+_CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+
+def _dumps(obj) -> str:
+    """Serialize a script payload to compact JSON, with orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def to_data_url(html: str) -> str:
+    """Return a base64 ``data:`` URL for an HTML document.
+    
+    Base64 encoding runs in C and, unlike raw or percent-encoded HTML, is
+    safe for characters such as '#' that would otherwise end the URL.
+    """
+    return "data:text/html;base64," + base64.b64encode(html.encode('utf-8')).decode('ascii')
+
+
+# Static Chrome options per (headless, load_images) setting, built on first use.
+_OPTIONS_CACHE: Dict[tuple, Options] = {}
+
+# Chrome subsystems automation never uses; disabling them trims startup time
+# and background CPU/memory.
+_LEAN_CHROME_ARGS = (
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-sync',
+    '--disable-default-apps',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--no-first-run',
+)
+
+# Profile state cleared before a --user-data-dir is reused, so each session
+# starts without the previous one's cookies, storage or open tabs. The rest
+# (first-run setup, history, HTTP cache, preferences) carries over to the
+# next session that gets the profile, and spares Chrome the initialization
+# of a brand new profile. Chrome 96+ keeps cookies under Default/Network;
+# the older location is listed for earlier versions.
+_PROFILE_STATE = (
+    'SingletonLock', 'SingletonSocket', 'SingletonCookie',
+    os.path.join('Default', 'Network', 'Cookies'),
+    os.path.join('Default', 'Network', 'Cookies-journal'),
+    os.path.join('Default', 'Cookies'),
+    os.path.join('Default', 'Cookies-journal'),
+    os.path.join('Default', 'Local Storage'),
+    os.path.join('Default', 'Session Storage'),
+    os.path.join('Default', 'Sessions'),
+    os.path.join('Default', 'IndexedDB'),
+    os.path.join('Default', 'Service Worker'),
+)
+
+
+def _reset_profile(profile_dir: str):
+    """Remove session state from a Chrome profile directory."""
+    for name in _PROFILE_STATE:
+        path = os.path.join(profile_dir, name)
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.lexists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# URL patterns blocked through CDP when load_css is False. Coordinate-based
+# clicks don't need styling when the layout is already known.
+_STYLE_URL_PATTERNS = ('*.css', '*.woff', '*.woff2', '*.ttf', '*.otf')
+
+
+def _base_options(headless: bool, load_images: bool = True) -> Options:
+    """Return the shared Chrome options template; copy before modifying."""
+    key = (headless, load_images)
+    options = _OPTIONS_CACHE.get(key)
+    if options is None:
+        options = Options()
+        if headless:
+            options.add_argument('--headless=new')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-blink-features=AutomationControlled')
+        for arg in _LEAN_CHROME_ARGS:
+            options.add_argument(arg)
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        if not load_images:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        _OPTIONS_CACHE[key] = options
+    return options
+
+
+def _binary_major_version(binary: str) -> Optional[str]:
+    """Return the major version reported by ``binary --version``, if any."""
+    try:
+        output = subprocess.run([binary, '--version'], capture_output=True,
+                                text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r'(\d+)\.\d+', output)
+    return match.group(1) if match else None
+
+
+def _chrome_major_version() -> Optional[str]:
+    """Return the major version of the Chrome found on PATH, if any."""
+    for name in _CHROME_BINARIES:
+        binary = shutil.which(name)
+        if not binary:
+            continue
+        version = _binary_major_version(binary)
+        if version:
+            return version
+    return None
+
+
+def _is_executable(path: Optional[str]) -> bool:
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_driver_path() -> str:
+    """Locate ChromeDriver, preferring one on PATH, then the on-disk cache."""
+    system_chromedriver = shutil.which('chromedriver')
+    if system_chromedriver:
+        return system_chromedriver
+    
+    chrome_version = _chrome_major_version() or 'unknown'
+    try:
+        cache = json.loads(_DRIVER_CACHE_FILE.read_text())
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    cached_path = cache.get(chrome_version)
+    # A driver replaced in place by another tool may no longer match Chrome
+    if _is_executable(cached_path) and (
+            chrome_version == 'unknown' or _binary_major_version(cached_path) == chrome_version):
+        return cached_path
+    
+    driver_path = ChromeDriverManager().install()
+    cache[chrome_version] = driver_path
+    try:
+        _DRIVER_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        _DRIVER_CACHE_FILE.write_text(json.dumps(cache))
+    except OSError:
+        pass  # The cache is only an optimization
+    return driver_path
+
+
+class _SharedService(Service):
+    """ChromeDriver service that outlives the sessions using it.
+    
+    webdriver.Chrome starts its service when created and stops it on quit();
+    here start() only launches chromedriver if it isn't running and stop()
+    is deferred to shutdown(), so every session talks to one process.
+    """
+    
+    def start(self):
+        process = getattr(self, 'process', None)
+        if process is None or process.poll() is not None:
+            super().start()
+    
+    def stop(self):
+        pass  # Sessions come and go; see shutdown()
+    
+    def shutdown(self):
+        """Stop the chromedriver process."""
+        if getattr(self, 'process', None) is not None:
+            super().stop()
 
 
 class WebAutomation:
     """Main automation class for web browser control and click automation."""
     
     _driver_path = None  # Class attribute to cache ChromeDriver path
+    _shared_service: Optional[_SharedService] = None  # chromedriver reused by all sessions
+    _profile_pool: 'queue.Queue[str]' = queue.Queue()  # Reset profile directories ready for reuse
+    _profile_dirs: List[str] = []  # Every profile directory created, removed at exit
+    _shared: Optional['WebAutomation'] = None  # Instance handed out by get_shared()
+    _RECORDING_WAIT_SLICE = 30.0  # Seconds per async wait before re-arming
+    _SCRIPT_TIMEOUT_MARGIN = 10.0  # Seconds allowed beyond a batch's total delay
     
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, load_images: bool = True,
+                 load_css: bool = True, cdp_endpoint: Optional[str] = None):
         self.driver: Optional[webdriver.Chrome] = None
         self.headless = headless
-        self.action_chains: Optional[ActionChains] = None
+        self.load_images = load_images  # False skips image loading for coordinate-only runs
+        self.load_css = load_css  # False blocks stylesheets and web fonts, for pre-known layouts
+        self.cdp_endpoint = cdp_endpoint  # "host:port" of a running Chrome to open a tab in
         self.recorded_clicks: List[Dict[str, Union[int, float]]] = []
         self.recording_mode: bool = False
+        self._stopped_clicks: Optional[List[Dict[str, Union[int, float]]]] = None  # Raw clicks from wait_for_recording_stop()
+        self._frame_id: Optional[str] = None  # Main frame id, cached by set_html()
+        self._window_size: Optional[Tuple[int, int]] = None  # Last size applied or read back
+        self._current_url: Optional[str] = None  # URL read back from the browser; cleared on loads and clicks
+        self._cdp_enabled: bool = False  # CDP domains enabled for the current browser
+        self._last_shot_hash: Optional[bytes] = None  # SHA-256 of the last capture_if_changed() image
+        self._profile_dir: Optional[str] = None  # --user-data-dir checked out of the profile pool
+    
+    @classmethod
+    def get_shared(cls, headless: bool = True) -> 'WebAutomation':
+        """Return a process-wide instance with a running browser.
+        
+        Callers such as tests can navigate this one browser instead of each
+        paying Chrome startup. It is created on first use (``headless``
+        applies then) and quit when the interpreter exits.
+        """
+        if WebAutomation._shared is None:
+            WebAutomation._shared = cls(headless=headless)
+            atexit.register(WebAutomation._shutdown_shared)
+        if not WebAutomation._shared.driver:
+            WebAutomation._shared.start_browser()
+        return WebAutomation._shared
+    
+    @classmethod
+    def launch_shared(cls, n_tabs: int, headless: bool = True, load_images: bool = True,
+                      load_css: bool = True) -> List['WebAutomation']:
+        """Start one Chrome and return ``n_tabs`` started instances, one per tab.
+        
+        The first instance launches the browser; the others attach to it
+        through its DevTools endpoint and each work in a tab of their own,
+        costing a tab rather than a whole Chrome process tree. Stop the
+        first instance last: its stop_browser() quits Chrome.
+        """
+        if n_tabs < 1:
+            raise ValueError("n_tabs must be at least 1.")
+        owner = cls(headless=headless, load_images=load_images, load_css=load_css).start_browser()
+        endpoint = owner.driver.capabilities['goog:chromeOptions']['debuggerAddress']
+        return [owner] + [cls(load_css=load_css, cdp_endpoint=endpoint).start_browser()
+                          for _ in range(n_tabs - 1)]
+    
+    @staticmethod
+    def _get_service() -> _SharedService:
+        """Return the chromedriver service shared by all sessions, creating it on first use."""
+        if WebAutomation._shared_service is None:
+            if WebAutomation._driver_path is None:
+                WebAutomation._driver_path = _resolve_driver_path()
+            WebAutomation._shared_service = _SharedService(WebAutomation._driver_path)
+            atexit.register(WebAutomation._shutdown_service)
+        return WebAutomation._shared_service
+    
+    @staticmethod
+    def _shutdown_service():
+        """Stop the shared chromedriver, after the shared browser's session ends."""
+        WebAutomation._shutdown_shared()
+        if WebAutomation._shared_service is not None:
+            WebAutomation._shared_service.shutdown()
+            WebAutomation._shared_service = None
+    
+    @staticmethod
+    def _checkout_profile() -> str:
+        """Return a reset profile directory from the pool, or a new one."""
+        try:
+            return WebAutomation._profile_pool.get_nowait()
+        except queue.Empty:
+            pass
+        if not WebAutomation._profile_dirs:
+            atexit.register(WebAutomation._remove_profiles)
+        profile_dir = tempfile.mkdtemp(prefix='chrome_user_data_')
+        WebAutomation._profile_dirs.append(profile_dir)
+        return profile_dir
+    
+    @staticmethod
+    def _return_profile(profile_dir: str):
+        """Reset a profile directory in the background and put it back in the pool."""
+        def reset_and_return():
+            _reset_profile(profile_dir)
+            WebAutomation._profile_pool.put(profile_dir)
+        threading.Thread(target=reset_and_return, daemon=True).start()
+    
+    @staticmethod
+    def _remove_profiles():
+        """Delete the profile directories created by this process."""
+        for profile_dir in WebAutomation._profile_dirs:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        WebAutomation._profile_dirs.clear()
+    
+    @staticmethod
+    def _shutdown_shared():
+        """Quit the browser handed out by get_shared()."""
+        if WebAutomation._shared is not None:
+            WebAutomation._shared.stop_browser()
+            WebAutomation._shared = None
     
     def start_browser(self, url: str = "about:blank"):
         """Initialize and start the web browser."""
         if self.driver:
             self.stop_browser()
         
-        # Setup Chrome options
-        options = Options()
-        if self.headless:
-            options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument(f'--user-data-dir=/tmp/chrome_user_data_{int(time.time() * 1000000)}_{id(self)}')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
+        if self.cdp_endpoint:
+            # Attach to the running browser; its launch options already apply
+            options = Options()
+            options.add_experimental_option("debuggerAddress", self.cdp_endpoint)
+        else:
+            # Setup Chrome options from the cached template; only the profile
+            # directory differs between instances. Profiles are reused from a
+            # pool, so Chrome skips first-run initialization of a new one.
+            options = copy.deepcopy(_base_options(self.headless, self.load_images))
+            self._profile_dir = self._checkout_profile()
+            options.add_argument(f'--user-data-dir={self._profile_dir}')
         
         # Setup Chrome driver
-        if WebAutomation._driver_path is None:
-            try:
-                # Try to use system ChromeDriver first
-                import shutil
-                system_chromedriver = shutil.which('chromedriver')
-                if system_chromedriver:
-                    WebAutomation._driver_path = system_chromedriver
-                else:
-                    WebAutomation._driver_path = ChromeDriverManager().install()
-            except ImportError:
-                # Fallback to ChromeDriverManager if system driver not available
-                WebAutomation._driver_path = ChromeDriverManager().install()
-        service = Service(WebAutomation._driver_path)
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.action_chains = ActionChains(self.driver)
+        try:
+            self.driver = webdriver.Chrome(service=self._get_service(), options=options)
+        except Exception:
+            self._release_profile()
+            raise
+        if self.cdp_endpoint:
+            self.driver.switch_to.new_window('tab')
+        self._enable_cdp_domains()
         
         # Navigate to URL
         if url != "about:blank":
             self.driver.get(url)
+        self._current_url = None  # The load may have redirected
         
         return self
     
+    def _enable_cdp_domains(self):
+        """Enable the CDP domains used by the CDP-based helpers, once per browser."""
+        if self._cdp_enabled:
+            return
+        self.driver.execute_cdp_cmd("Page.enable", {})
+        self.driver.execute_cdp_cmd("Runtime.enable", {})
+        # Keep the page behaving as focused so captures and synthetic input
+        # work while the window is in the background
+        self.driver.execute_cdp_cmd("Emulation.setFocusEmulationEnabled", {"enabled": True})
+        # Install the page helper in every future document and in this one
+        self.driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _HELPER_JS})
+        self.driver.execute_cdp_cmd("Runtime.evaluate", {"expression": _HELPER_JS})
+        if not self.load_css:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(_STYLE_URL_PATTERNS)})
+        self._cdp_enabled = True
+    
     def stop_browser(self):
         """Close the web browser and cleanup resources."""
         if self.driver:
+            if self.cdp_endpoint:
+                # Close only our tab; quitting an attached session leaves the
+                # browser running for its other users
+                try:
+                    self.driver.close()
+                except WebDriverException:
+                    pass
             self.driver.quit()
             self.driver = None
-            self.action_chains = None
+            self._release_profile()
+            self._frame_id = None
+            self._window_size = None
+            self._current_url = None
+            self._cdp_enabled = False
+            self._last_shot_hash = None
+    
+    def _call_helper(self, script: str, *args, is_async: bool = False):
+        """Run a script that calls into window.__wa, injecting it if missing.
+        
+        The helper is normally installed with each new document; pages that
+        predate it or replaced their window state get it on first use.
+        """
+        execute = self.driver.execute_async_script if is_async else self.driver.execute_script
+        result = execute(script, *args)
+        if result == _HELPER_MISSING:
+            self.driver.execute_script(_HELPER_JS)
+            result = execute(script, *args)
+        return result
+    
+    @contextlib.contextmanager
+    def _script_timeout(self, seconds: float):
+        """Use ``seconds`` as the async script timeout within the block.
+        
+        The session's previous timeout is restored afterwards, so callers'
+        own execute_async_script calls are unaffected.
+        """
+        previous = self.driver.timeouts.script
+        self.driver.set_script_timeout(seconds)
+        try:
+            yield
+        finally:
+            self.driver.set_script_timeout(previous)
+    
+    def _release_profile(self):
+        """Hand this instance's profile directory back to the pool."""
+        if self._profile_dir is not None:
+            self._return_profile(self._profile_dir)
+            self._profile_dir = None
     
     def navigate_to(self, url: str):
         """Navigate to a specific URL."""
         if not self.driver:
             raise RuntimeError("Browser not started. Call start_browser() first.")
         self.driver.get(url)
+        self._current_url = None  # The load may have redirected
+        self._last_shot_hash = None
+        return self
+    
+    def set_html(self, html: str):
+        """Replace the current document with the given HTML.
+        
+        Uses CDP Page.setDocumentContent, which avoids encoding the page into
+        a data: URL and the navigation round-trip of loading one.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        if self._frame_id is None:
+            frame_tree = self.driver.execute_cdp_cmd("Page.getFrameTree", {})
+            self._frame_id = frame_tree["frameTree"]["frame"]["id"]
+        self.driver.execute_cdp_cmd("Page.setDocumentContent", {
+            "frameId": self._frame_id,
+            "html": html
+        })
+        return self
+    
+    def wait_until_ready(self, timeout: float = 5.0):
+        """Wait until the page has finished loading and a frame has painted.
+        
+        Use instead of a fixed sleep after navigating or changing the page.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        WebDriverWait(self.driver, timeout).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+        with self._script_timeout(timeout):
+            self.driver.execute_async_script(_NEXT_FRAME_JS)
         return self
     
     def click_at_coordinates(self, x: int, y: int, delay: float = 1.0):
         """Click at specific pixel coordinates (relative to top-left of the viewport)."""
-        if not self.driver or not self.action_chains:
+        if not self.driver:
             raise RuntimeError("Browser not started. Call start_browser() first.")
         
-        # Execute JavaScript to click at absolute coordinates
-        # This is more reliable than ActionChains for absolute positioning
-        self.driver.execute_script(f"""
-            var event = new MouseEvent('click', {{
-                'view': window,
-                'bubbles': true,
-                'cancelable': true,
-                'clientX': {x},
-                'clientY': {y}
-            }});
-            var element = document.elementFromPoint({x}, {y});
-            if (element) element.dispatchEvent(event);
-        """)
+        self._current_url = None  # The click may navigate
+        
+        # Send a trusted press/release pair through CDP at absolute coordinates;
+        # one protocol message each, with real hit-testing and focus handling
+        for event_type in ("mousePressed", "mouseReleased"):
+            self.driver.execute_cdp_cmd("Input.dispatchMouseEvent", {
+                "type": event_type,
+                "x": x,
+                "y": y,
+                "button": "left",
+                "clickCount": 1
+            })
         
         # Wait for the specified delay
         if delay > 0:
@@ -104,26 +789,143 @@ class WebAutomation:
         
         return self
     
-    def execute_click_sequence(self, sequence: ClickSequence, loops: int = 1):
-        """Execute a click sequence for the specified number of loops."""
+    def _execute_sequence_js(self, payload: str, duration: float, loops: int = 1,
+                             cache_targets: bool = False):
+        """Play a serialized sequence payload ``loops`` times in the page.
+        
+        The payload is a list of [x, y, offset_ms], or {xs, ys, delay} for a
+        sequence whose actions all share one delay (see window.__wa.runSequence).
+        
+        One WebDriver round-trip regardless of the number of clicks;
+        ``duration`` is the length of one pass in seconds.
+        """
+        self._current_url = None  # The clicks may navigate
+        with self._script_timeout(duration * loops + self._SCRIPT_TIMEOUT_MARGIN):
+            error = self._call_helper(_RUN_SEQUENCE_JS, payload, loops, cache_targets, is_async=True)
+        if error:
+            raise JavascriptException(error)
+    
+    def execute_click_sequence(self, sequence: ClickSequence, loops: int = 1, batch: bool = False,
+                               cache_targets: bool = False):
+        """Execute a click sequence for the specified number of loops.
+        
+        By default clicks are sent one at a time, which keeps working when a
+        click navigates to another page. With ``batch=True`` each loop is
+        sent to the browser as one async script that dispatches the clicks
+        and waits out the delays in the page, costing a single WebDriver
+        round-trip per loop (or one in total when INFO progress logging is
+        disabled). Only batch sequences that stay on the same page: a click
+        that follows a link or submits a form ends the in-page script.
+        
+        With ``cache_targets=True`` batched playback hit-tests each point only
+        on the first loop and clicks the same elements afterwards, as long as
+        they remain in the document. Only use it when the elements under the
+        points don't change between loops (no dialogs or re-rendering).
+        """
         if not self.driver:
             raise RuntimeError("Browser not started. Call start_browser() first.")
         
         if not sequence.actions:
-            print("Warning: No actions in sequence to execute")
+            logger.warning("No actions in sequence to execute")
             return self
         
-        print(f"Executing sequence '{sequence.name}' {loops} time(s)")
-        print(f"Sequence contains {len(sequence.actions)} actions")
+        logger.info("Executing sequence '%s' %d time(s)", sequence.name, loops)
+        logger.info("Sequence contains %d actions", len(sequence.actions))
+        
+        actions = sequence.actions
+        log_actions = logger.isEnabledFor(logging.DEBUG)
+        
+        if batch:
+            # Serialized once and reused by every loop. When every action has
+            # the same delay, only the coordinates and that delay are sent.
+            xs, ys, uniform_delay = sequence.columns()
+            if uniform_delay is not None:
+                uniform_delay = max(0.0, uniform_delay)
+                duration = uniform_delay * len(xs)
+                payload = _dumps({'xs': xs, 'ys': ys, 'delay': uniform_delay * 1000})
+            else:
+                offsets = sequence.schedule(0.0)
+                duration = offsets[-1]
+                payload = _dumps([[action.x, action.y, offset * 1000]
+                                  for action, offset in zip(actions, offsets)])
+            if not logger.isEnabledFor(logging.INFO):
+                # No per-loop progress to report: play every loop in one call
+                self._execute_sequence_js(payload, duration, loops, cache_targets)
+                return self
+        else:
+            offsets = sequence.schedule(0.0)
+            click = self.click_at_coordinates
+            monotonic = time.monotonic
+            sleep = time.sleep
         
         for loop in range(loops):
-            print(f"Loop {loop + 1}/{loops}")
+            logger.info("Loop %d/%d", loop + 1, loops)
+            if log_actions:
+                for i, action in enumerate(actions):
+                    logger.debug("  Action %d: Click at (%s, %s)", i + 1, action.x, action.y)
             
-            for i, action in enumerate(sequence.actions):
-                print(f"  Action {i + 1}: Click at ({action.x}, {action.y})")
-                self.click_at_coordinates(action.x, action.y, action.delay)
+            if batch:
+                self._execute_sequence_js(payload, duration, 1, cache_targets)
+                continue
+            
+            # Sleep to absolute deadlines so dispatch time doesn't add up
+            t0 = monotonic()
+            for action, offset in zip(actions, offsets):
+                click(action.x, action.y, 0)
+                remaining = t0 + offset - monotonic()
+                if remaining > 0:
+                    sleep(remaining)
+        
+        logger.info("Sequence execution completed")
+        return self
+    
+    async def aclick_at_coordinates(self, x: int, y: int, delay: float = 1.0):
+        """Async variant of click_at_coordinates().
+        
+        The CDP calls run in the event loop's default executor and the delay
+        is awaited, so other coroutines keep running in the meantime.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.click_at_coordinates, x, y, 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self
+    
+    async def aexecute_click_sequence(self, sequence: ClickSequence, loops: int = 1, batch: bool = False,
+                                      cache_targets: bool = False):
+        """Async variant of execute_click_sequence().
+        
+        Each WebAutomation drives its own tab, so sequences on several
+        instances can be played concurrently with ``asyncio.gather()``.
+        Clicks sent one at a time have the delays between them awaited;
+        batched playback waits in the page, so it runs in the default executor.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        event_loop = asyncio.get_running_loop()
+        if batch or not sequence.actions:
+            await event_loop.run_in_executor(
+                None, self.execute_click_sequence, sequence, loops, batch, cache_targets)
+            return self
+        
+        logger.info("Executing sequence '%s' %d time(s)", sequence.name, loops)
+        actions = sequence.actions
+        offsets = sequence.schedule(0.0)
         
-        print("Sequence execution completed")
+        for loop in range(loops):
+            logger.info("Loop %d/%d", loop + 1, loops)
+            t0 = event_loop.time()
+            for action, offset in zip(actions, offsets):
+                await self.aclick_at_coordinates(action.x, action.y, 0)
+                remaining = t0 + offset - event_loop.time()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+        
+        logger.info("Sequence execution completed")
         return self
     
     def wait(self, seconds: float):
@@ -131,19 +933,109 @@ class WebAutomation:
         time.sleep(seconds)
         return self
     
-    def get_window_size(self):
-        """Get the current window size."""
+    def get_window_size(self) -> Dict[str, int]:
+        """Get the current window size.
+        
+        Served from the last size set or read, so only the first call after
+        starting the browser costs a WebDriver round-trip.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        if self._window_size is None:
+            size = self.driver.get_window_size()
+            self._window_size = (size['width'], size['height'])
+        width, height = self._window_size
+        return {'width': width, 'height': height}
+    
+    def get_current_url(self) -> str:
+        """Get the URL of the current page.
+        
+        Read from the browser after each page load or click, which may
+        redirect or navigate, and served from that value until the next one.
+        """
         if not self.driver:
             raise RuntimeError("Browser not started. Call start_browser() first.")
-        return self.driver.get_window_size()
+        if self._current_url is None:
+            self._current_url = self.driver.current_url
+        return self._current_url
     
     def set_window_size(self, width: int, height: int):
-        """Set the browser window size."""
+        """Set the browser window size (skipped if already applied)."""
         if not self.driver:
             raise RuntimeError("Browser not started. Call start_browser() first.")
+        if self._window_size == (width, height):
+            return self
         self.driver.set_window_size(width, height)
+        self._window_size = (width, height)
         return self
     
+    def save_screenshot_fast(self, path: str, fmt: str = "png", quality: Optional[int] = None):
+        """Save a screenshot of the viewport using CDP Page.captureScreenshot.
+        
+        Faster than the WebDriver screenshot endpoint and doesn't steal window
+        focus. ``fmt`` is "png", "jpeg" or "webp"; ``quality`` (0-100) applies
+        to the lossy formats only.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        params = {"format": fmt}
+        if quality is not None:
+            params["quality"] = quality
+        result = self.driver.execute_cdp_cmd("Page.captureScreenshot", params)
+        Path(path).write_bytes(base64.b64decode(result["data"]))
+        return path
+    
+    def capture_if_changed(self, fmt: str = "jpeg", quality: Optional[int] = 60) -> Optional[bytes]:
+        """Capture the viewport and return the image only if it changed.
+        
+        Returns None when the image is identical (by SHA-256) to the one
+        from the previous call, e.g. to check cheaply whether a click had a
+        visible effect without storing or comparing duplicate frames. The
+        comparison restarts after navigate_to().
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        params = {"format": fmt}
+        if quality is not None and fmt != "png":
+            params["quality"] = quality
+        data = base64.b64decode(self.driver.execute_cdp_cmd("Page.captureScreenshot", params)["data"])
+        digest = hashlib.sha256(data).digest()
+        if digest == self._last_shot_hash:
+            return None
+        self._last_shot_hash = digest
+        return data
+    
+    def capture_sizes(self, sizes: List[Tuple[int, int]], fmt: str = "png",
+                      url: Optional[str] = None) -> List[bytes]:
+        """Capture the page at several viewport sizes and return the images.
+        
+        Each size is applied with CDP Emulation.setDeviceMetricsOverride,
+        which re-lays out the page without resizing the OS window or waiting
+        on window-manager round-trips. The override is cleared afterwards.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started. Call start_browser() first.")
+        
+        if url:
+            self.navigate_to(url)
+        
+        images = []
+        try:
+            for width, height in sizes:
+                self.driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+                    "width": width,
+                    "height": height,
+                    "deviceScaleFactor": 0,
+                    "mobile": False
+                })
+                result = self.driver.execute_cdp_cmd("Page.captureScreenshot", {"format": fmt})
+                images.append(base64.b64decode(result["data"]))
+        finally:
+            self.driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+        return images
+    
     def __enter__(self):
         """Context manager entry."""
         return self
@@ -155,122 +1047,92 @@ class WebAutomation:
         
         self.recording_mode = True
         self.recorded_clicks.clear()
+        self._stopped_clicks = None
+        self._current_url = None  # The user's clicks may navigate
         
         # Inject JavaScript to capture click events
-        self.driver.execute_script("""
-            // Store reference to automation object for access from click handler
-            window.clickRecorder = {
-                recordedClicks: [],
-                recording: true
-            };
-            
-            // Function to handle click events
-            function recordClick(event) {
-                if (window.clickRecorder.recording) {
-                    const click = {
-                        x: event.clientX,
-                        y: event.clientY,
-                        timestamp: Date.now()
-                    };
-                    window.clickRecorder.recordedClicks.push(click);
-                    
-                    // Visual feedback for recorded click
-                    const marker = document.createElement('div');
-                    marker.style.position = 'fixed';
-                    marker.style.left = event.clientX + 'px';
-                    marker.style.top = event.clientY + 'px';
-                    marker.style.width = '10px';
-                    marker.style.height = '10px';
-                    marker.style.backgroundColor = 'red';
-                    marker.style.borderRadius = '50%';
-                    marker.style.pointerEvents = 'none';
-                    marker.style.zIndex = '9999';
-                    marker.style.transform = 'translate(-50%, -50%)';
-                    document.body.appendChild(marker);
-                    
-                    // Remove marker after 1 second
-                    setTimeout(() => {
-                        if (marker.parentNode) {
-                            marker.parentNode.removeChild(marker);
-                        }
-                    }, 1000);
-                    
-                    console.log('Recorded click at:', event.clientX, event.clientY);
-                }
-            }
-            
-            // Add click event listener
-            document.addEventListener('click', recordClick, true);
-            
-            // Show recording indicator
-            const indicator = document.createElement('div');
-            indicator.id = 'recordingIndicator';
-            indicator.innerHTML = '🔴 RECORDING CLICKS - Press ESC to stop';
-            indicator.style.position = 'fixed';
-            indicator.style.top = '10px';
-            indicator.style.left = '50%';
-            indicator.style.transform = 'translateX(-50%)';
-            indicator.style.backgroundColor = 'rgba(255, 0, 0, 0.8)';
-            indicator.style.color = 'white';
-            indicator.style.padding = '10px 20px';
-            indicator.style.borderRadius = '5px';
-            indicator.style.fontFamily = 'Arial, sans-serif';
-            indicator.style.fontSize = '14px';
-            indicator.style.zIndex = '10000';
-            indicator.style.fontWeight = 'bold';
-            document.body.appendChild(indicator);
-            
-            // Add ESC key listener to stop recording
-            function stopRecordingOnEsc(event) {
-                if (event.key === 'Escape') {
-                    window.clickRecorder.recording = false;
-                    const indicator = document.getElementById('recordingIndicator');
-                    if (indicator) {
-                        indicator.innerHTML = '⏹️ RECORDING STOPPED - Close this tab to continue';
-                        indicator.style.backgroundColor = 'rgba(0, 150, 0, 0.8)';
-                    }
-                    document.removeEventListener('keydown', stopRecordingOnEsc);
-                    document.removeEventListener('click', recordClick, true);
-                }
-            }
-            document.addEventListener('keydown', stopRecordingOnEsc);
-        """)
+        self._call_helper(_RECORDER_JS)
         
         print("Recording mode started! Click anywhere on the page to record clicks.")
         print("Press ESC key to stop recording.")
         return self
     
+    def get_recording_state(self) -> Dict[str, Union[bool, int]]:
+        """Return the in-page recorder state as {'recording', 'clickCount'}.
+        
+        Uses CDP Runtime.evaluate directly, skipping the execute_script
+        wrapper, since this is called repeatedly while waiting on the user.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started.")
+        
+        result = self.driver.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": _RECORDING_STATE_EXPR,
+            "returnByValue": True
+        })
+        if 'exceptionDetails' in result:
+            raise JavascriptException(result['exceptionDetails'].get('text', 'Recording state check failed'))
+        return result['result']['value']
+    
+    def wait_for_recording_stop(self, timeout: Optional[float] = None) -> bool:
+        """Block until the in-page recorder stops, e.g. when ESC is pressed.
+        
+        The page resolves a pending async script when recording stops, so
+        no round-trips are made while the user is clicking; the recorded
+        clicks arrive with that notification, sparing stop_recording_mode()
+        another fetch. The wait is re-armed periodically to stay within the
+        script timeout. Returns False if ``timeout`` seconds elapse first.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started.")
+        
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._RECORDING_WAIT_SLICE
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    return False
+            try:
+                with self._script_timeout(wait):
+                    self._stopped_clicks = self._call_helper(_WAIT_FOR_STOP_JS, is_async=True)
+                return True
+            except TimeoutException:
+                # Collect what has been recorded so far while re-arming
+                self.poll_recorded_clicks()
+                continue
+    
+    def poll_recorded_clicks(self) -> List[Dict[str, Union[int, float]]]:
+        """Fetch the clicks recorded since the last poll without stopping.
+        
+        The page buffer is emptied, so each call transfers only new clicks;
+        they are appended to ``recorded_clicks`` and returned.
+        """
+        if not self.driver:
+            raise RuntimeError("Browser not started.")
+        
+        clicks = self._call_helper(_DRAIN_RECORDING_JS) or []
+        self.recorded_clicks.extend(clicks)
+        return clicks
+    
     def stop_recording_mode(self):
         """Stop recording mode and retrieve recorded clicks."""
         if not self.driver:
             raise RuntimeError("Browser not started.")
         
-        # Stop recording and get recorded clicks
-        recorded_data = self.driver.execute_script("""
-            if (window.clickRecorder) {
-                window.clickRecorder.recording = false;
-                return window.clickRecorder.recordedClicks;
-            }
-            return [];
-        """)
+        # Stop recording and get the clicks not yet polled, unless they
+        # already arrived with the stop notification
+        if self._stopped_clicks is not None:
+            recorded_data = self._stopped_clicks
+            self._stopped_clicks = None
+        else:
+            recorded_data = self._call_helper(_STOP_RECORDING_JS)
         
         self.recording_mode = False
         
-        # Convert recorded clicks and calculate delays
+        # Delays were computed in the page as the clicks happened
         if recorded_data:
-            for i, click in enumerate(recorded_data):
-                # Calculate delay as time since previous click (default 1.0s for first click)
-                if i == 0:
-                    delay = 1.0
-                else:
-                    time_diff = (click['timestamp'] - recorded_data[i-1]['timestamp']) / 1000.0
-                    delay = max(0.1, min(time_diff, 10.0))  # Clamp between 0.1s and 10s
-                
-                self.recorded_clicks.append({
-                    'x': click['x'],
-                    'y': click['y'],
-                    'delay': delay
-                })
+            self.recorded_clicks.extend(recorded_data)
         
         print(f"Recording stopped. Captured {len(self.recorded_clicks)} clicks.")
         return self.recorded_clicks
@@ -291,7 +1153,7 @@ class WebAutomation:
         if not self.recorded_clicks:
             raise ValueError("No clicks recorded. Use start_recording_mode() first.")
         
-        current_url = url or (self.driver.current_url if self.driver else "about:blank")
+        current_url = url or (self.get_current_url() if self.driver else "about:blank")
         window_size = self.get_window_size() if self.driver else {"width": 1024, "height": 768}
         
         config = {
@@ -302,8 +1164,13 @@ class WebAutomation:
             "clicks": self.recorded_clicks
         }
         
-        with open(filename, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Encode in one call and write once; orjson does it in C when present
+        if orjson is not None:
+            data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(config, indent=2).encode('utf-8')
+        with open(filename, 'wb') as f:
+            f.write(data)
         
         print(f"Recorded clicks saved to {filename}")
         return filename